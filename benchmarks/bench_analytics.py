@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Memory and query-time comparison of reports/analytics.py against the
+# object-dtype merge + group-by approach the report scripts used before.
+#
+#   python benchmarks/bench_analytics.py              # synthetic data
+#   python benchmarks/bench_analytics.py --csv        # db_*.csv in the working directory
+#   BENCH_SEASONS=10 python benchmarks/bench_analytics.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'reports'))
+
+from analytics import AnalyticsStore  # noqa: E402
+
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+
+# Columns the store keeps, per table. It drops match_id, the teams' division,
+# pools' team_count and the per-row season (held once per tournament), so
+# memory is compared against frames restricted to these columns.
+STORE_COLUMNS = [
+    ['tournament_id', 'name', 'season'],
+    ['team_name', 'club_name'],
+    ['pool_id', 'tournament_id', 'division', 'pool_name'],
+    ['pool_id', 'team_name', 'rank_seed', 'matches_won', 'matches_lost', 'point_diff', 'pool_finish'],
+    ['pool_id', 'team_name', 'opponent_name', 'outcome', 'sets_won', 'sets_lost', 'score_log'],
+]
+SEASONS = int(os.getenv("BENCH_SEASONS", "5"))
+CLUBS = int(os.getenv("BENCH_CLUBS", "100"))
+
+
+def synthetic_tables(seasons, clubs, tournaments_per_season=6, pools_per_tournament=60, pool_size=6):
+    rng = np.random.default_rng(0)
+    club_names = [f"CLUB{i:03d}" for i in range(clubs)]
+    team_names = [f"{c} {age}{tier}" for c in club_names for age in range(11, 19) for tier in 'NRA']
+    teams = pd.DataFrame({
+        'team_name': team_names,
+        'club_name': [t.split()[0] for t in team_names],
+        'division': [t.split()[1][:2] + 's' for t in team_names],
+    })
+
+    tournaments, pools, standings, matches = [], [], [], []
+    for season in range(2025 - seasons + 1, 2026):
+        for t in range(tournaments_per_season):
+            tournament_id = f"tournament{t}_{season}"
+            tournaments.append((tournament_id, f"Tournament {t} {season}", season))
+            for p in range(pools_per_tournament):
+                pool_id = f"{tournament_id}_16s_pool{p}"
+                pools.append((pool_id, season, tournament_id, '16s', f"Pool {p}", pool_size))
+                entrants = rng.choice(len(team_names), pool_size, replace=False)
+                for rank, team in enumerate(entrants, 1):
+                    won = int(rng.integers(0, pool_size))
+                    standings.append((pool_id, team_names[team], season, rank, won,
+                                      pool_size - 1 - won, int(rng.integers(-30, 30)), rank))
+                for i, a in enumerate(entrants):
+                    for b in entrants[i + 1:]:
+                        outcome = rng.choice(['Won', 'Lost', 'Split'])
+                        flipped = {'Won': 'Lost', 'Lost': 'Won', 'Split': 'Split'}[outcome]
+                        match_id = f"{pool_id}_{a}_{b}"
+                        matches.append((match_id, pool_id, team_names[a], season, team_names[b], outcome, 1, 1, '25-20,20-25'))
+                        matches.append((match_id, pool_id, team_names[b], season, team_names[a], flipped, 1, 1, '20-25,25-20'))
+
+    return (
+        pd.DataFrame(tournaments, columns=['tournament_id', 'name', 'season']),
+        teams,
+        pd.DataFrame(pools, columns=['pool_id', 'season', 'tournament_id', 'division', 'pool_name', 'team_count']),
+        pd.DataFrame(standings, columns=['pool_id', 'team_name', 'season', 'rank_seed', 'matches_won',
+                                         'matches_lost', 'point_diff', 'pool_finish']),
+        pd.DataFrame(matches, columns=['match_id', 'pool_id', 'team_name', 'season', 'opponent_name', 'outcome',
+                                       'sets_won', 'sets_lost', 'score_log']),
+    )
+
+
+# --- Baseline: what the report scripts did with plain DataFrames ---
+
+def baseline_club_by_tournament(tournaments, teams, pools, standings, matches):
+    pool_results = pd.merge(standings, pools, on='pool_id')
+    pool_results = pd.merge(pool_results, tournaments, on='tournament_id')
+    pool_results = pd.merge(pool_results, teams, on='team_name')
+    return pool_results.groupby(['tournament_id', 'name', 'club_name']).agg({
+        'matches_won': 'sum', 'matches_lost': 'sum', 'team_name': 'nunique'})
+
+
+def baseline_team_by_season(tournaments, teams, pools, standings, matches):
+    rows = pd.merge(standings.drop(columns='season', errors='ignore'), pools[['pool_id', 'tournament_id']], on='pool_id')
+    rows = pd.merge(rows, tournaments[['tournament_id', 'season']], on='tournament_id')
+    rows = pd.merge(rows, teams[['team_name', 'club_name']], on='team_name')
+    return rows.groupby(['season', 'team_name']).agg({'matches_won': 'sum', 'matches_lost': 'sum'})
+
+
+def baseline_head_to_head(tournaments, teams, pools, standings, matches):
+    club_of = teams.set_index('team_name')['club_name']
+    rows = matches[['team_name', 'opponent_name', 'outcome']].copy()
+    rows['club_name'] = rows['team_name'].map(club_of)
+    rows['opp_club'] = rows['opponent_name'].map(club_of).fillna('Unknown')
+    return rows.dropna(subset=['club_name']).groupby(['club_name', 'opp_club', 'outcome']).size().unstack(fill_value=0)
+
+
+def best_time(fn):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    if '--csv' in sys.argv[1:]:
+        tables = tuple(pd.read_csv(f'db_{name}.csv') for name in
+                       ['tournaments', 'teams', 'pools', 'pool_standings', 'match_results'])
+    else:
+        tables = synthetic_tables(SEASONS, CLUBS)
+
+    start = time.perf_counter()
+    store = AnalyticsStore(*tables)
+    build_time = time.perf_counter() - start
+
+    full_bytes = sum(int(t.memory_usage(deep=True).sum()) for t in tables)
+    frames_bytes = sum(int(t[[c for c in columns if c in t]].memory_usage(deep=True).sum())
+                       for t, columns in zip(tables, STORE_COLUMNS))
+    store_bytes = store.memory_usage()
+
+    print(f"Rows: {len(tables[3]):,} standings, {len(tables[4]):,} match rows; store built in {build_time:.3f}s")
+    print(f"{'':<24} {'DataFrames':>12} {'Store':>12} {'Ratio':>7}")
+    print(f"{'memory (MB)':<24} {frames_bytes / 1e6:>12.2f} {store_bytes / 1e6:>12.2f} {frames_bytes / store_bytes:>6.1f}x")
+    print(f"{'  all columns (MB)':<24} {full_bytes / 1e6:>12.2f} {store_bytes / 1e6:>12.2f} {full_bytes / store_bytes:>6.1f}x")
+
+    queries = [
+        ('club_by_tournament', baseline_club_by_tournament, store.club_by_tournament),
+        ('team_by_season', baseline_team_by_season, store.team_by_season),
+        ('head_to_head', baseline_head_to_head, store.head_to_head),
+    ]
+    for name, baseline, rollup in queries:
+        base = best_time(lambda: baseline(*tables))
+        fast = best_time(rollup)
+        print(f"{name + ' (ms)':<24} {base * 1e3:>12.1f} {fast * 1e3:>12.1f} {base / fast:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
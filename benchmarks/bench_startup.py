@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+# Import-time / cold start benchmark for the pipeline modules.
+#
+# Each module is imported in a fresh interpreter from an empty working
+# directory. The run fails if an import takes longer than its budget, creates
+# files (logs/, data/, ...), or pulls in a dependency that should be deferred
+# until first use.
+#
+#   python benchmarks/bench_startup.py
+#   STARTUP_BUDGET_SCALE=2 python benchmarks/bench_startup.py   # slower machines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = int(os.getenv("STARTUP_RUNS", "5"))
+BUDGET_SCALE = float(os.getenv("STARTUP_BUDGET_SCALE", "1"))
+
+# module, path to add, import budget (seconds), modules that must not be loaded
+MODULES = [
+    ("extract", "code", 0.2, ["requests", "bs4", "pandas"]),
+    ("load_data", "code", 0.2, ["psycopg2", "dotenv", "pandas"]),
+    ("api", "code", 2.0, ["psycopg2", "uvicorn", "dotenv", "pyarrow", "pandas"]),
+    ("ntvs_etl", "dags", 5.0, ["extract", "load_data", "requests", "bs4", "psycopg2"]),
+]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module, path, forbidden):
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, path))
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, forbidden=forbidden)],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        created = sorted(os.listdir(cwd))
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data, created
+
+
+def main():
+    failures = []
+    print(f"{'module':<12} {'best (s)':>9} {'budget (s)':>11}  status")
+    for module, path, budget, forbidden in MODULES:
+        budget *= BUDGET_SCALE
+        timings = []
+        problems = []
+        for _ in range(RUNS):
+            data, created = probe(module, path, forbidden)
+            if data is None:
+                break
+            timings.append(data["elapsed"])
+            if data["loaded"]:
+                problems.append(f"imports {', '.join(data['loaded'])} eagerly")
+            if created:
+                problems.append(f"creates {', '.join(created)} on import")
+
+        if not timings:
+            # Typically a missing dependency (e.g. airflow outside its image)
+            print(f"{module:<12} {'-':>9} {budget:>11.3f}  skipped ({created})")
+            continue
+
+        best = min(timings)
+        if best > budget:
+            problems.append(f"import took {best:.3f}s (budget {budget:.3f}s)")
+        problems = sorted(set(problems))
+
+        print(f"{module:<12} {best:>9.3f} {budget:>11.3f}  {'; '.join(problems) or 'ok'}")
+        failures.extend(f"{module}: {p}" for p in problems)
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
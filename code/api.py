@@ -1,66 +1,545 @@
 import fastapi
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import QueryParams
+import anyio
+import asyncio
+from contextlib import asynccontextmanager
 import logging
-import uvicorn
-import psycopg2
-import sys
 import os
-from dotenv import load_dotenv
+import io
+import csv
+import json
+import uuid
+import threading
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
+# Importing this module must stay free of I/O: .env loading, log files and the
+# database connection are all set up in lifespan(), when the server starts.
+# psycopg2 is imported on first connect.
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(logging.StreamHandler())
-logger.addHandler(logging.FileHandler("logs/api.log"))
 
-logger.info("Starting application...")
+conn_lock = threading.Lock()
 
-try:
-    conn = psycopg2.connect(
+def setup_logging():
+    if logger.handlers:
+        return
+    os.makedirs("logs", exist_ok=True)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
+    logger.addHandler(logging.FileHandler("logs/api.log"))
+
+def connect_db(**kwargs):
+    import psycopg2
+
+    return psycopg2.connect(
         host=os.getenv("DB_HOST", "localhost"),
         database=os.getenv("DB_NAME", "postgres"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
+        **kwargs,
     )
-    logger.info("Connected to database...")
-    cursor = conn.cursor()
-except Exception as e:
-    logger.critical(f"Failed to connect to the database: {e}")
-    sys.exit(1)
 
-app = fastapi.FastAPI()     
+def get_conn():
+    """Returns the shared connection, reconnecting if it is missing or closed."""
+    conn = getattr(app.state, "conn", None)
+    if conn is not None and not conn.closed:
+        return conn
+    with conn_lock:
+        conn = getattr(app.state, "conn", None)
+        if conn is None or conn.closed:
+            conn = connect_db()
+            # Autocommit: reads never leave the shared connection idle in a transaction
+            conn.autocommit = True
+            app.state.conn = conn
+            logger.info("Connected to database...")
+    return conn
+
+@asynccontextmanager
+async def lifespan(app):
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
+    setup_logging()
+    logger.info("Starting application...")
+
+    try:
+        get_conn()
+    except Exception as e:
+        # Stay up and report not-ready; get_conn() retries on the next request
+        logger.error(f"Failed to connect to the database: {e}")
+
+    yield
+
+    logger.info("Closing database connection...")
+    conn = getattr(app.state, "conn", None)
+    if conn is not None and not conn.closed:
+        conn.close()
+    logger.info("Application stopped.")
+
+app = fastapi.FastAPI(lifespan=lifespan)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+def is_uncompressed(scope):
+    # The SSE stream must reach clients event by event, and Arrow IPC is binary already
+    if scope["path"] == "/changes/stream":
+        return True
+    return scope["path"].startswith("/export/") and QueryParams(scope["query_string"]).get("format") == "arrow"
+
+class CompressionMiddleware:
+    """Brotli (or gzip) compression that leaves is_uncompressed() routes alone."""
+
+    def __init__(self, app):
+        self.app = app
+        if BrotliMiddleware is not None:
+            # Brotli for clients that accept it, gzip for the rest
+            self.compressed = BrotliMiddleware(app, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=COMPRESSION_MIN_SIZE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and is_uncompressed(scope):
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed(scope, receive, send)
+
+app.add_middleware(CompressionMiddleware)
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/healthz")
+def read_healthz():
+    # Liveness: the process is up and serving requests
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def read_readyz():
+    # Readiness: the database is reachable
+    try:
+        with get_conn().cursor() as cursor:
+            cursor.execute("SELECT 1;")
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        raise fastapi.HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready"}
+
+# --- Projection & Embedding ---
+
+# Columns each resource may return. fields= and include= are validated against
+# these before anything is spliced into SQL.
+RESOURCE_COLUMNS = {
+    "tournaments": ["tournament_id", "name", "season"],
+    "pools": ["pool_id", "tournament_id", "season", "division", "pool_name", "team_count"],
+    "standings": ["pool_id", "team_name", "season", "rank_seed", "matches_won", "matches_lost", "point_diff", "pool_finish"],
+    "matches": ["match_id", "pool_id", "team_name", "season", "opponent_name", "outcome", "sets_won", "sets_lost", "score_log"],
+}
+
+# Relations embedded under each pool: (table, alias, order by)
+POOL_RELATIONS = {
+    "standings": ("pool_standings", "ps", "ps.rank_seed, ps.team_name"),
+    "matches": ("match_results", "mr", "mr.match_id, mr.team_name"),
+}
+
+def parse_projection(fields, include):
+    """Validates fields=/include= and returns ({resource: [columns]}, {included relations}).
+
+    Fields are comma separated, qualified by relation for embedded resources
+    (e.g. name,pools.pool_name,standings.team_name). Naming a relation's field
+    implies including it, and standings/matches imply pools.
+    """
+    included = set()
+    for relation in (include or "").split(","):
+        relation = relation.strip()
+        if not relation:
+            continue
+        if relation not in RESOURCE_COLUMNS or relation == "tournaments":
+            raise fastapi.HTTPException(status_code=400, detail=f"Unknown include: {relation}")
+        included.add(relation)
+
+    projection = {}
+    for field in (fields or "").split(","):
+        field = field.strip()
+        if not field:
+            continue
+        relation, _, column = field.rpartition(".")
+        relation = relation or "tournaments"
+        if column not in RESOURCE_COLUMNS.get(relation, []):
+            raise fastapi.HTTPException(status_code=400, detail=f"Unknown field: {field}")
+        if relation != "tournaments":
+            included.add(relation)
+        columns = projection.setdefault(relation, [])
+        if column not in columns:
+            columns.append(column)
+
+    if included & POOL_RELATIONS.keys():
+        included.add("pools")
+    return projection, included
+
+def json_object(resource, alias, projection, children=()):
+    columns = projection.get(resource, RESOURCE_COLUMNS[resource])
+    pairs = [f"'{col}', {alias}.{col}" for col in columns]
+    pairs += [f"'{name}', COALESCE({source}.items, '[]'::json)" for name, source in children]
+    return f"json_build_object({', '.join(pairs)})"
+
+def build_tournament_query(projection, included, single):
+    """Builds one SQL statement returning the tournament(s) as a JSON document.
+
+    Embedded relations are aggregated with LATERAL joins, so a full tournament
+    page (pools, standings, matches) costs a single round trip.
+    """
+    pool_children = []
+    pool_joins = ""
+    for relation, (table, alias, order_by) in POOL_RELATIONS.items():
+        if relation in included:
+            pool_children.append((relation, f"{alias}_agg"))
+            pool_joins += f"""
+                LEFT JOIN LATERAL (
+                    SELECT json_agg({json_object(relation, alias, projection)} ORDER BY {order_by}) AS items
+                    FROM ntvs.{table} {alias}
+                    WHERE {alias}.pool_id = p.pool_id AND {alias}.season = p.season
+                ) {alias}_agg ON TRUE"""
+
+    children = []
+    joins = ""
+    if "pools" in included:
+        children.append(("pools", "p_agg"))
+        joins = f"""
+        LEFT JOIN LATERAL (
+            SELECT json_agg({json_object("pools", "p", projection, pool_children)} ORDER BY p.pool_id) AS items
+            FROM ntvs.pools p{pool_joins}
+            WHERE p.tournament_id = t.tournament_id AND p.season = t.season
+        ) p_agg ON TRUE"""
+
+    document = json_object("tournaments", "t", projection, children)
+    if single:
+        return f"SELECT {document}::text FROM ntvs.tournaments t{joins} WHERE t.tournament_id = %s;"
+    return f"SELECT COALESCE(json_agg({document} ORDER BY t.tournament_id), '[]'::json)::text FROM ntvs.tournaments t{joins};"
+
 @app.get("/tournaments")
-def read_tournaments():
-    cursor.execute("SELECT * FROM ntvs.tournaments;")
-    return cursor.fetchall()
+def read_tournaments(fields: str = None, include: str = None):
+    if not fields and not include:
+        with get_conn().cursor() as cursor:
+            cursor.execute("SELECT * FROM ntvs.tournaments;")
+            return cursor.fetchall()
+
+    projection, included = parse_projection(fields, include)
+    with get_conn().cursor() as cursor:
+        cursor.execute(build_tournament_query(projection, included, single=False))
+        # Postgres already rendered the JSON; pass it through untouched
+        return fastapi.Response(content=cursor.fetchone()[0], media_type="application/json")
 
 @app.get("/tournaments/{tournament_id}")
-def read_tournament(tournament_id: str):
-    # Use parameterized query to prevent SQL Injection
-    cursor.execute("SELECT * FROM ntvs.tournaments WHERE tournament_id = %s;", (tournament_id,))
-    result = cursor.fetchone()
+def read_tournament(tournament_id: str, fields: str = None, include: str = None):
+    if not fields and not include:
+        # Use parameterized query to prevent SQL Injection
+        with get_conn().cursor() as cursor:
+            cursor.execute("SELECT * FROM ntvs.tournaments WHERE tournament_id = %s;", (tournament_id,))
+            result = cursor.fetchone()
+    else:
+        projection, included = parse_projection(fields, include)
+        with get_conn().cursor() as cursor:
+            cursor.execute(build_tournament_query(projection, included, single=True), (tournament_id,))
+            result = cursor.fetchone()
+        if result is not None:
+            result = fastapi.Response(content=result[0], media_type="application/json")
     
     if result is None:
         raise fastapi.HTTPException(status_code=404, detail="Tournament not found")
         
     return result
 
-if __name__ == "__main__":
+# --- Bulk Export ---
+
+# Rows fetched from the server-side cursor per round trip / response chunk
+# (override with EXPORT_CHUNK_SIZE)
+DEFAULT_EXPORT_CHUNK_SIZE = 5000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# table -> (select, tournament id column, season column, order by)
+# Teams have no tournament or season; they are filtered through the standings.
+EXPORT_TABLES = {
+    "tournaments": ("SELECT t.* FROM ntvs.tournaments t", "t.tournament_id", "t.season", "t.tournament_id"),
+    "teams": ("SELECT tm.* FROM ntvs.teams tm", None, None, "tm.team_name"),
+    "pools": ("SELECT p.* FROM ntvs.pools p", "p.tournament_id", "p.season", "p.pool_id"),
+    "pool_standings": (
+        "SELECT ps.* FROM ntvs.pool_standings ps"
+        " JOIN ntvs.pools p ON ps.pool_id = p.pool_id AND ps.season = p.season",
+        "p.tournament_id", "ps.season", "ps.pool_id, ps.team_name"),
+    "match_results": (
+        "SELECT mr.* FROM ntvs.match_results mr"
+        " JOIN ntvs.pools p ON mr.pool_id = p.pool_id AND mr.season = p.season",
+        "p.tournament_id", "mr.season", "mr.match_id, mr.team_name"),
+}
+
+# Postgres integer type OIDs (int2, int4, int8); everything else exports as text
+INTEGER_OIDS = {20, 21, 23}
+
+def build_export_query(table, tournament_id=None, season=None):
+    select_sql, tournament_col, season_col, order_by = EXPORT_TABLES[table]
+
+    conditions = []
+    params = []
+    if tournament_id:
+        conditions.append(f"{tournament_col or 'p.tournament_id'} = %s")
+        params.append(tournament_id)
+    if season:
+        # Filtering on the partition key lets Postgres scan only that season
+        conditions.append(f"{season_col or 'ps.season'} = %s")
+        params.append(season)
+
+    where = ""
+    if conditions and tournament_col is None:
+        where = f"""
+            WHERE tm.team_name IN (
+                SELECT ps.team_name FROM ntvs.pool_standings ps
+                JOIN ntvs.pools p ON ps.pool_id = p.pool_id AND ps.season = p.season
+                WHERE {" AND ".join(conditions)})"""
+    elif conditions:
+        where = " WHERE " + " AND ".join(conditions)
+
+    return f"{select_sql}{where} ORDER BY {order_by}", params
+
+# Backstop for exports whose client vanished before the stream was closed:
+# Postgres ends the session instead of holding its snapshot and locks.
+EXPORT_SESSION_OPTIONS = "-c statement_timeout=60000 -c idle_in_transaction_session_timeout=60000"
+
+def open_export(sql, params, chunk_size):
+    """Opens a named server-side cursor and fetches its first chunk.
+
+    The first fetch also fills in cursor.description, so headers and schemas
+    can be written even when the export matches no rows.
+    """
+    export_conn = connect_db(options=EXPORT_SESSION_OPTIONS)
+    try:
+        # A named cursor keeps the result set in Postgres; only one chunk is held here
+        export_cursor = export_conn.cursor(name=f"export_{uuid.uuid4().hex}")
+        export_cursor.itersize = chunk_size
+        export_cursor.execute(sql, params)
+        rows = export_cursor.fetchmany(chunk_size)
+    except Exception:
+        export_conn.close()
+        raise
+    return export_conn, export_cursor, rows
+
+def close_export(export_conn, export_cursor):
+    try:
+        export_cursor.close()
+        export_conn.rollback()
+    finally:
+        export_conn.close()
+
+class NdjsonEncoder:
+    def __init__(self, description):
+        self.names = [c.name for c in description]
+
+    def start(self):
+        return ""
+
+    def encode(self, rows):
+        return "".join(json.dumps(dict(zip(self.names, row)), default=str) + "\n" for row in rows)
+
+    def finish(self):
+        return ""
+
+class CsvEncoder:
+    def __init__(self, description):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.names = [c.name for c in description]
+
+    def drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        return data
+
+    def start(self):
+        self.writer.writerow(self.names)
+        return self.drain()
+
+    def encode(self, rows):
+        self.writer.writerows(rows)
+        return self.drain()
+
+    def finish(self):
+        return ""
+
+class ArrowEncoder:
+    def __init__(self, description):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.buffer = io.BytesIO()
+        self.schema = pa.schema([
+            (c.name, pa.int64() if c.type_code in INTEGER_OIDS else pa.string())
+            for c in description
+        ])
+        self.writer = None
+
+    def drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        return data
+
+    def start(self):
+        self.writer = self.pa.ipc.new_stream(self.buffer, self.schema)
+        return self.drain()
+
+    def encode(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_batch(self.pa.record_batch(
+            [self.pa.array(col, type=field.type) for col, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+        return self.drain()
+
+    def finish(self):
+        self.writer.close()
+        return self.drain()
+
+EXPORT_ENCODERS = {
+    "ndjson": NdjsonEncoder,
+    "csv": CsvEncoder,
+    "arrow": ArrowEncoder,
+}
+
+async def stream_export(request, export_conn, export_cursor, rows, encoder):
+    """Streams encoded chunks, fetching each one in a worker thread.
+
+    The cursor and connection are closed however the stream ends, including
+    when the client disconnects mid-download.
+    """
+    chunk_size = export_cursor.itersize
     try:
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+        yield encoder.start()
+        while rows:
+            yield encoder.encode(rows)
+            if await request.is_disconnected():
+                logger.info("Export client disconnected; closing cursor")
+                return
+            rows = await run_in_threadpool(export_cursor.fetchmany, chunk_size)
+        yield encoder.finish()
     finally:
-        logger.info("Closing database connection...")
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-        logger.info("Application stopped.")
+        # Shielded so cleanup still runs when the stream task is being cancelled
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(close_export, export_conn, export_cursor)
+
+@app.get("/export/{table}")
+async def export_table(request: fastapi.Request, table: str, format: str = "ndjson",
+                       tournament_id: str = None, season: int = None):
+    if table not in EXPORT_TABLES:
+        raise fastapi.HTTPException(status_code=404, detail="Table not found")
+    if format not in EXPORT_FORMATS:
+        raise fastapi.HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise fastapi.HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+
+    sql, params = build_export_query(table, tournament_id, season)
+    logger.info(f"Exporting {table} as {format} (tournament_id={tournament_id}, season={season})")
+
+    chunk_size = int(os.getenv("EXPORT_CHUNK_SIZE", DEFAULT_EXPORT_CHUNK_SIZE))
+    export_conn, export_cursor, rows = await run_in_threadpool(open_export, sql, params, chunk_size)
+    try:
+        encoder = EXPORT_ENCODERS[format](export_cursor.description)
+    except Exception:
+        await run_in_threadpool(close_export, export_conn, export_cursor)
+        raise
+
+    extension = "arrows" if format == "arrow" else format
+    return StreamingResponse(
+        stream_export(request, export_conn, export_cursor, rows, encoder),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'},
+    )
+
+# --- Change Feed ---
+
+# Seconds between polls of the change log on an open event stream
+# (override with CHANGES_POLL_INTERVAL)
+DEFAULT_CHANGES_POLL_INTERVAL = 30
+
+CHANGES_SQL = """
+    SELECT load_version, table_name, operation, row_key
+    FROM ntvs.change_log
+    WHERE load_version > %s
+    ORDER BY load_version, change_id;
+"""
+
+LATEST_VERSION_SQL = "SELECT COALESCE(MAX(load_version), 0) FROM ntvs.load_versions;"
+
+def fetch_changes(change_cursor, since):
+    change_cursor.execute(LATEST_VERSION_SQL)
+    latest_version = change_cursor.fetchone()[0]
+    change_cursor.execute(CHANGES_SQL, (since,))
+    changes = [
+        {"load_version": v, "table": t, "operation": op, "key": key}
+        for v, t, op, key in change_cursor.fetchall()
+        if v <= latest_version
+    ]
+    return latest_version, changes
+
+@app.get("/changes")
+def read_changes(since: int = 0):
+    with get_conn().cursor() as cursor:
+        latest_version, changes = fetch_changes(cursor, since)
+    return {"since": since, "latest_version": latest_version, "changes": changes}
+
+def poll_changes(since):
+    with get_conn().cursor() as cursor:
+        return fetch_changes(cursor, since)
+
+async def stream_changes(request, since):
+    """Emits new change log entries as server-sent events.
+
+    Runs on the event loop and borrows a worker thread only for each poll
+    query, so idle listeners hold neither a thread nor a database connection.
+    """
+    poll_interval = float(os.getenv("CHANGES_POLL_INTERVAL", DEFAULT_CHANGES_POLL_INTERVAL))
+    while not await request.is_disconnected():
+        latest_version, changes = await run_in_threadpool(poll_changes, since)
+        if latest_version > since:
+            payload = {"since": since, "latest_version": latest_version, "changes": changes}
+            yield f"id: {latest_version}\nevent: changes\ndata: {json.dumps(payload)}\n\n"
+            since = latest_version
+        else:
+            # Comment line keeps proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+
+        # Sleep in short steps so a disconnect is noticed well before the next poll
+        waited = 0.0
+        while waited < poll_interval and not await request.is_disconnected():
+            step = min(1.0, poll_interval - waited)
+            await asyncio.sleep(step)
+            waited += step
+
+@app.get("/changes/stream")
+async def read_changes_stream(request: fastapi.Request, since: int = 0, last_event_id: str = fastapi.Header(None)):
+    # Reconnecting EventSource clients resume from the last version they saw
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(stream_changes(request, since), media_type="text/event-stream")
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,6 +1,4 @@
 
-import requests
-from bs4 import BeautifulSoup
 import re
 import csv
 import sys
@@ -8,21 +6,26 @@ import hashlib
 import os
 import logging
 
-# Ensure directories exist
-os.makedirs("data", exist_ok=True)
-os.makedirs("logs", exist_ok=True)
+# requests and bs4 are imported where they are used so that importing this
+# module (e.g. while Airflow parses the DAG) does no I/O and stays cheap.
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("logs/extract.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def setup_logging():
+    # Ensure directories exist
+    os.makedirs("data", exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("logs/extract.log"),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
 # Base URL for VStar results
 BASE_URL = "https://results.vstarvolleyball.com"
 HEADERS = {
@@ -43,6 +46,8 @@ def extract_club_name(team_name):
     return parts[0]
 
 def get_tournament_page(tournament_id):
+    import requests
+
     url = f"{BASE_URL}/index.php?id={tournament_id}"
     logger.info(f"Fetching tournament page: {url}")
     response = requests.get(url, headers=HEADERS)
@@ -50,6 +55,8 @@ def get_tournament_page(tournament_id):
     return response.text
 
 def parse_result_links(html, tournament_id):
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, 'html.parser')
     result_files = []
     elements = soup.find_all(attrs={"data-bs-file": True, "data-bs-eventid": tournament_id})
@@ -79,6 +86,9 @@ def extract_pool_data(tournament_id, file_name):
     pass
 
 def extract_pool_data_v2(vstar_id, db_tournament_id, file_name):
+    import requests
+    from bs4 import BeautifulSoup
+
     url = f"{BASE_URL}/view.php?id={vstar_id}&file={file_name}"
     response = requests.get(url, headers=HEADERS)
     if response.status_code != 200: return [], [], [], [] 
@@ -260,6 +270,8 @@ def extract_pool_data_v2(vstar_id, db_tournament_id, file_name):
     return list(extracted_teams.values()), list(extracted_pools.values()), extracted_standings, extracted_matches
 
 def main():
+    setup_logging()
+
     # Tournaments List with YEAR
     tournaments_to_process = [
         ("kickoffclassic", "Kickoff Classic", "2025"),
@@ -283,7 +295,7 @@ def main():
         
         logger.info(f"Starting ETL for {full_name} ({db_tournament_id})...")
         
-        db_tournaments.append({"tournament_id": db_tournament_id, "name": full_name})
+        db_tournaments.append({"tournament_id": db_tournament_id, "name": full_name, "season": t_year})
         
         html = get_tournament_page(vstar_id)
         if not html:
@@ -302,14 +314,19 @@ def main():
                 if t['team_name'] not in db_teams:
                     db_teams[t['team_name']] = t
                     
+            # Season is the partition key for pools, standings and matches
             for p in pools:
+                p['season'] = t_year
                 db_pools[p['pool_id']] = p
-                
+
+            for rec in standings + matches:
+                rec['season'] = t_year
+
             db_standings.extend(standings)
             db_matches.extend(matches)
         
     with open("data/tournaments.csv", 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=["tournament_id", "name"])
+        writer = csv.DictWriter(f, fieldnames=["tournament_id", "name", "season"])
         writer.writeheader()
         writer.writerows(db_tournaments)
         
@@ -319,17 +336,17 @@ def main():
         writer.writerows(list(db_teams.values()))
 
     with open("data/pools.csv", 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=["pool_id", "tournament_id", "division", "pool_name", "team_count"])
+        writer = csv.DictWriter(f, fieldnames=["pool_id", "season", "tournament_id", "division", "pool_name", "team_count"])
         writer.writeheader()
         writer.writerows(list(db_pools.values()))
         
     with open("data/pool_standings.csv", 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=["pool_id", "team_name", "rank_seed", "matches_won", "matches_lost", "point_diff", "pool_finish"])
+        writer = csv.DictWriter(f, fieldnames=["pool_id", "team_name", "season", "rank_seed", "matches_won", "matches_lost", "point_diff", "pool_finish"])
         writer.writeheader()
         writer.writerows(db_standings)
 
     with open("data/match_results.csv", 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=["match_id", "pool_id", "team_name", "opponent_name", "outcome", "sets_won", "sets_lost", "score_log"])
+        writer = csv.DictWriter(f, fieldnames=["match_id", "pool_id", "team_name", "season", "opponent_name", "outcome", "sets_won", "sets_lost", "score_log"])
         writer.writeheader()
         writer.writerows(db_matches)
         
@@ -1,25 +1,34 @@
 import os
+import sys
 import csv
-import psycopg2
+import json
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("logs/load.log"),
-        logging.StreamHandler()
-    ]
-)
+
+# psycopg2 and dotenv are imported where they are used so that importing this
+# module (e.g. while Airflow parses the DAG) does no I/O and stays cheap.
+
 logger = logging.getLogger(__name__)
 
+def setup():
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
+    # Configure logging
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("logs/load.log"),
+            logging.StreamHandler()
+        ]
+    )
+
 def connect_db():
+    import psycopg2
+
     return psycopg2.connect(
         host=os.getenv("DB_HOST", "localhost"),
         database=os.getenv("DB_NAME", "postgres"),
@@ -27,83 +36,295 @@ def connect_db():
         password=os.getenv("DB_PASSWORD")
     )
 
-def load_csv(cursor, file_path, table_name, columns, conflict_col):
+def load_csv(cursor, file_path, table_name, columns, conflict_col, skip_seasons=()):
+    """Upserts a CSV and returns (changes, seen_keys).
+
+    changes is a list of ("insert" | "update", key) for rows that actually
+    changed; seen_keys holds the key of every row present in the file.
+    Rows whose season is in skip_seasons (archived seasons) are ignored.
+    """
     if not os.path.exists(file_path):
         logger.warning(f"File not found: {file_path}")
-        return
+        return [], None
 
     # Handle single or multiple conflict keys
     conflict_keys = [k.strip() for k in conflict_col.split(",")]
 
+    cols = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    returning = ", ".join(conflict_keys)
+
+    # Only update columns that are NOT part of the primary key
+    update_cols = [col for col in columns if col not in conflict_keys]
+    updates = ", ".join([f"{col} = EXCLUDED.{col}" for col in update_cols])
+
+    if updates:
+        # Skip no-op updates so unchanged rows are not reported as changes
+        current = ", ".join([f"target.{col}" for col in update_cols])
+        incoming = ", ".join([f"EXCLUDED.{col}" for col in update_cols])
+        sql = f"""
+            INSERT INTO ntvs.{table_name} AS target ({cols})
+            VALUES ({placeholders})
+            ON CONFLICT ({conflict_col})
+            DO UPDATE SET {updates}
+            WHERE ROW({current}) IS DISTINCT FROM ROW({incoming})
+            RETURNING {returning};
+        """
+    else:
+        # If all columns are keys, do nothing on conflict
+        sql = f"""
+            INSERT INTO ntvs.{table_name} ({cols})
+            VALUES ({placeholders})
+            ON CONFLICT ({conflict_col})
+            DO NOTHING
+            RETURNING {returning};
+        """
+
+    # Partitioned tables cannot return system columns (xmax), so inserts are
+    # told apart from updates by the keys that existed before the upsert.
+    # Season-keyed tables only need the seasons in this file.
+    if "season" in conflict_keys:
+        cursor.execute(f"SELECT {returning} FROM ntvs.{table_name} WHERE season = ANY(%s);",
+                       (sorted(read_seasons(file_path) - set(skip_seasons)),))
+    else:
+        cursor.execute(f"SELECT {returning} FROM ntvs.{table_name};")
+    existing_keys = set(cursor.fetchall())
+
+    changes = []
+    seen_keys = []
     with open(file_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            cols = ", ".join(columns)
-            placeholders = ", ".join(["%s"] * len(columns))
-            
-            # Only update columns that are NOT part of the primary key
-            update_cols = [col for col in columns if col not in conflict_keys]
-            updates = ", ".join([f"{col} = EXCLUDED.{col}" for col in update_cols])
-            
-            if updates:
-                sql = f"""
-                    INSERT INTO ntvs.{table_name} ({cols})
-                    VALUES ({placeholders})
-                    ON CONFLICT ({conflict_col})
-                    DO UPDATE SET {updates};
-                """
-            else:
-                # If all columns are keys, do nothing on conflict
-                sql = f"""
-                    INSERT INTO ntvs.{table_name} ({cols})
-                    VALUES ({placeholders})
-                    ON CONFLICT ({conflict_col})
-                    DO NOTHING;
-                """
-
+            if row.get("season") and int(row["season"]) in skip_seasons:
+                continue
             # Handle empty strings by converting them to None (NULL in SQL)
             values = [row[col] if row[col] != "" else None for col in columns]
             cursor.execute(sql, values)
-    
-    logger.info(f"Loaded {file_path} into {table_name}")
+            seen_keys.append(tuple(row[k] for k in conflict_keys))
+
+            result = cursor.fetchone()
+            if result:
+                key = tuple(result)
+                changes.append(("update" if key in existing_keys else "insert", key))
+                existing_keys.add(key)
+
+    logger.info(f"Loaded {file_path} into {table_name} ({len(changes)} changed rows)")
+    return changes, seen_keys
+
+def delete_missing(cursor, table_name, conflict_col, seen_keys, tournament_ids, seasons):
+    """Deletes rows of the given tournaments whose keys were not in this load.
+
+    Only tournaments that were actually extracted are touched, so a tournament
+    page that failed to fetch never wipes its history.
+    """
+    if seen_keys is None or not tournament_ids:
+        return []
+
+    conflict_keys = [k.strip() for k in conflict_col.split(",")]
+    key_cols = ", ".join([f"target.{k}" for k in conflict_keys])
+    arrays = ", ".join(["%s::text[]"] * len(conflict_keys))
+    # Compared as text since the CSV values are strings; NOT EXISTS plans as a
+    # hashed anti-join (NOT IN over a subquery rescans the key list per row)
+    key_match = " AND ".join([f"seen.{k} = target.{k}::text" for k in conflict_keys])
+
+    # The season filter prunes the scan down to the partitions being loaded
+    if table_name == "pools":
+        scope = "target.season = ANY(%s) AND target.tournament_id = ANY(%s)"
+    else:
+        scope = """target.season = ANY(%s) AND target.pool_id IN (
+            SELECT pool_id FROM ntvs.pools WHERE season = ANY(%s) AND tournament_id = ANY(%s))"""
+
+    sql = f"""
+        DELETE FROM ntvs.{table_name} AS target
+        WHERE {scope}
+        AND NOT EXISTS (
+            SELECT 1 FROM unnest({arrays}) AS seen({", ".join(conflict_keys)})
+            WHERE {key_match}
+        )
+        RETURNING {key_cols};
+    """
+    scope_params = [list(seasons), list(tournament_ids)]
+    if table_name != "pools":
+        scope_params.insert(0, list(seasons))
+    key_arrays = [list(col) for col in zip(*seen_keys)] or [[] for _ in conflict_keys]
+    cursor.execute(sql, scope_params + key_arrays)
+
+    deleted = [("delete", tuple(row)) for row in cursor.fetchall()]
+    if deleted:
+        logger.info(f"Deleted {len(deleted)} stale rows from {table_name}")
+    return deleted
+
+# Tables list-partitioned by season, in foreign key order
+PARTITIONED_TABLES = ["pools", "pool_standings", "match_results"]
+
+def read_seasons(file_path):
+    if not os.path.exists(file_path):
+        return set()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return {int(row["season"]) for row in csv.DictReader(f) if row.get("season")}
+
+def archived_seasons(cursor):
+    """Seasons whose partitions have been moved to ntvs_archive."""
+    cursor.execute("""
+        SELECT tablename FROM pg_tables
+        WHERE schemaname = 'ntvs_archive' AND tablename ~ '^pools_[0-9]+$';
+    """)
+    return {int(name.rsplit("_", 1)[1]) for (name,) in cursor.fetchall()}
+
+def ensure_season_partitions(cursor, seasons):
+    for season in sorted(seasons):
+        for table_name in PARTITIONED_TABLES:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS ntvs.{table_name}_{int(season)}
+                PARTITION OF ntvs.{table_name} FOR VALUES IN ({int(season)});
+            """)
+    if seasons:
+        logger.info(f"Ensured partitions for seasons: {sorted(seasons)}")
+
+def archive_season(cursor, season):
+    """Detaches a season's partitions and moves them into ntvs_archive.
+
+    The archived tables keep their data and can be queried or re-attached,
+    but no longer slow down queries and loads against ntvs.
+    """
+    season = int(season)
+    if season in archived_seasons(cursor):
+        raise ValueError(f"Season {season} is already archived in ntvs_archive")
+
+    # Children first: pools cannot be detached while standings reference them
+    for table_name in reversed(PARTITIONED_TABLES):
+        partition = f"{table_name}_{season}"
+        cursor.execute(f"ALTER TABLE ntvs.{table_name} DETACH PARTITION ntvs.{partition};")
+
+        # Detached partitions keep their foreign keys to ntvs.pools, which would
+        # block detaching the pools partition they point at.
+        cursor.execute("""
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            AND confrelid = 'ntvs.pools'::regclass;
+        """, (f"ntvs.{partition}",))
+        for (conname,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE ntvs.{partition} DROP CONSTRAINT "{conname}";')
+
+        cursor.execute(f"ALTER TABLE ntvs.{partition} SET SCHEMA ntvs_archive;")
+        logger.info(f"Archived ntvs.{partition} to ntvs_archive.{partition}")
+
+def start_load_version(cursor):
+    # Serialize loads so versions become visible in the order they were issued
+    cursor.execute("LOCK TABLE ntvs.load_versions IN EXCLUSIVE MODE;")
+    cursor.execute("INSERT INTO ntvs.load_versions DEFAULT VALUES RETURNING load_version;")
+    return cursor.fetchone()[0]
+
+def record_changes(cursor, load_version, table_name, conflict_col, changes):
+    if not changes:
+        return
+
+    from psycopg2.extras import execute_values
+
+    conflict_keys = [k.strip() for k in conflict_col.split(",")]
+    execute_values(
+        cursor,
+        "INSERT INTO ntvs.change_log (load_version, table_name, operation, row_key) VALUES %s",
+        [
+            (load_version, table_name, operation, json.dumps(dict(zip(conflict_keys, key))))
+            for operation, key in changes
+        ],
+    )
 
 def main():
+    setup()
+    conn = None
+    cursor = None
     try:
         conn = connect_db()
         cursor = conn.cursor()
-        
+
+        load_version = start_load_version(cursor)
+        logger.info(f"Starting load version {load_version}")
+
+        # Archived seasons stay archived: their rows are skipped rather than
+        # re-creating the partitions in ntvs
+        archived = archived_seasons(cursor)
+        skipped = read_seasons("data/tournaments.csv") & archived
+        if skipped:
+            logger.warning(f"Skipping rows of archived seasons: {sorted(skipped)}")
+        ensure_season_partitions(cursor, read_seasons("data/tournaments.csv") - archived)
+
         # Define loading order (important for Foreign Keys)
-        
-        # 1. Tournaments
-        load_csv(cursor, "data/tournaments.csv", "tournaments", 
-                 ["tournament_id", "name"], "tournament_id")
-        
-        # 2. Teams
-        load_csv(cursor, "data/teams.csv", "teams", 
-                 ["team_name", "club_name", "division"], "team_name")
-        
-        # 3. Pools
-        load_csv(cursor, "data/pools.csv", "pools", 
-                 ["pool_id", "tournament_id", "division", "pool_name", "team_count"], "pool_id")
-        
-        # 4. Standings (Compound Key)
-        load_csv(cursor, "data/pool_standings.csv", "pool_standings", 
-                 ["pool_id", "team_name", "rank_seed", "matches_won", "matches_lost", "point_diff", "pool_finish"], "pool_id, team_name")
-
-        # 5. Matches (Compound Key)
-        load_csv(cursor, "data/match_results.csv", "match_results", 
-                 ["match_id", "pool_id", "team_name", "opponent_name", "outcome", "sets_won", "sets_lost", "score_log"], "match_id, team_name")
+        tables = [
+            # 1. Tournaments
+            ("data/tournaments.csv", "tournaments",
+             ["tournament_id", "name", "season"], "tournament_id"),
+            # 2. Teams
+            ("data/teams.csv", "teams",
+             ["team_name", "club_name", "division"], "team_name"),
+            # 3. Pools
+            ("data/pools.csv", "pools",
+             ["pool_id", "season", "tournament_id", "division", "pool_name", "team_count"], "pool_id, season"),
+            # 4. Standings (Compound Key)
+            ("data/pool_standings.csv", "pool_standings",
+             ["pool_id", "team_name", "season", "rank_seed", "matches_won", "matches_lost", "point_diff", "pool_finish"], "pool_id, team_name, season"),
+            # 5. Matches (Compound Key)
+            ("data/match_results.csv", "match_results",
+             ["match_id", "pool_id", "team_name", "season", "opponent_name", "outcome", "sets_won", "sets_lost", "score_log"], "match_id, team_name, season"),
+        ]
+
+        seen = {}
+        for file_path, table_name, columns, conflict_col in tables:
+            skip_seasons = archived if table_name in PARTITIONED_TABLES else ()
+            changes, seen_keys = load_csv(cursor, file_path, table_name, columns, conflict_col, skip_seasons)
+            record_changes(cursor, load_version, table_name, conflict_col, changes)
+            seen[table_name] = seen_keys
+
+        # Tournaments that produced pools in this extract are fully refreshed;
+        # rows for them that disappeared upstream are removed (children first).
+        extracted_tournaments = set()
+        if os.path.exists("data/pools.csv"):
+            with open("data/pools.csv", 'r', encoding='utf-8') as f:
+                extracted_tournaments = {row["tournament_id"] for row in csv.DictReader(f)}
+        extracted_seasons = read_seasons("data/pools.csv") - archived
+
+        for file_path, table_name, columns, conflict_col in reversed(tables):
+            if table_name in PARTITIONED_TABLES:
+                deleted = delete_missing(cursor, table_name, conflict_col, seen[table_name],
+                                         extracted_tournaments, extracted_seasons)
+                record_changes(cursor, load_version, table_name, conflict_col, deleted)
 
         conn.commit()
-        logger.info("Successfully loaded all data into Postgres.")
-        
+        logger.info(f"Successfully loaded all data into Postgres (load version {load_version}).")
+
     except Exception as e:
         logger.error(f"Error loading data: {e}")
         if conn:
             conn.rollback()
+        # Fail the caller (e.g. the Airflow task) instead of reporting success
+        raise
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+def archive_main(seasons):
+    setup()
+    conn = None
+    cursor = None
+    try:
+        conn = connect_db()
+        cursor = conn.cursor()
+        for season in seasons:
+            archive_season(cursor, season)
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error archiving seasons {seasons}: {e}")
+        if conn:
+            conn.rollback()
+        raise
     finally:
         if cursor: cursor.close()
         if conn: conn.close()
 
 if __name__ == "__main__":
-    main()
+    # python load_data.py archive 2024 [2023 ...]
+    if len(sys.argv) > 2 and sys.argv[1] == "archive":
+        archive_main(sys.argv[2:])
+    else:
+        main()
@@ -2,10 +2,13 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
 import sys
-import os
 
-# Add the code directory to the path so we can import our scripts
-sys.path.append('/opt/airflow/code')
+# Add the code directory to the path so we can import our scripts.
+# The scripts themselves are imported inside the tasks, so parsing this
+# file stays cheap; guard the append because the scheduler re-parses it.
+CODE_DIR = '/opt/airflow/code'
+if CODE_DIR not in sys.path:
+    sys.path.append(CODE_DIR)
 
 def run_extraction():
     from extract import main as extract_main
@@ -1,7 +1,8 @@
 -- 1. Tournaments Table
 CREATE TABLE tournaments (
     tournament_id VARCHAR(50) PRIMARY KEY,
-    name VARCHAR(100) NOT NULL
+    name VARCHAR(100) NOT NULL,
+    season INT NOT NULL        -- Year suffix of tournament_id, e.g. 2025
 );
 
 -- 2. Teams Table
@@ -11,29 +12,36 @@ CREATE TABLE teams (
     division VARCHAR(50)
 );
 
+-- Pools, standings and matches are partitioned by season (one partition per
+-- year, e.g. pools_2025). Season is part of every key so upserts and
+-- current-season queries only touch that season's partition.
+
 -- 3. Pools Table
 CREATE TABLE pools (
-    pool_id VARCHAR(100) PRIMARY KEY,
+    pool_id VARCHAR(100),
+    season INT NOT NULL,
     tournament_id VARCHAR(50),
     division VARCHAR(50),
     pool_name VARCHAR(50),
     team_count INT,
+    PRIMARY KEY (pool_id, season),
     FOREIGN KEY (tournament_id) REFERENCES tournaments(tournament_id)
-);
+) PARTITION BY LIST (season);
 
 -- 4. Pool Standings Table (Link between Pools and Teams)
 CREATE TABLE pool_standings (
     pool_id VARCHAR(100),
     team_name VARCHAR(100),
+    season INT NOT NULL,
     rank_seed INT,
     matches_won INT,
     matches_lost INT,
     point_diff INT,
     pool_finish INT,
-    PRIMARY KEY (pool_id, team_name),
-    FOREIGN KEY (pool_id) REFERENCES pools(pool_id),
+    PRIMARY KEY (pool_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools(pool_id, season),
     FOREIGN KEY (team_name) REFERENCES teams(team_name)
-);
+) PARTITION BY LIST (season);
 
 -- 5. Match Results Table
 -- Note: Contains 2 rows per match (one for each team's perspective)
@@ -41,16 +49,44 @@ CREATE TABLE match_results (
     match_id VARCHAR(50),      -- Shared ID for the specific game
     pool_id VARCHAR(100),
     team_name VARCHAR(100),    -- The subject team
+    season INT NOT NULL,
     opponent_name VARCHAR(100), -- The opponent team
     outcome VARCHAR(20),       -- 'Won', 'Lost', 'Split'
     sets_won INT,
     sets_lost INT,
     score_log TEXT,
-    PRIMARY KEY (match_id, team_name),
-    FOREIGN KEY (pool_id) REFERENCES pools(pool_id),
+    PRIMARY KEY (match_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools(pool_id, season),
     FOREIGN KEY (team_name) REFERENCES teams(team_name)
+) PARTITION BY LIST (season);
+
+-- Partition per season, created by load_data at load time:
+-- CREATE TABLE pools_2025 PARTITION OF pools FOR VALUES IN (2025);
+
+-- Lookups by parent (tournament pages, embedded matches) and FK checks on pool deletes
+CREATE INDEX pools_tournament_idx ON pools (tournament_id, season);
+CREATE INDEX match_results_pool_idx ON match_results (pool_id, season);
+
+-- 6. Load Versions
+-- Each load_data run inserts one row; versions only ever increase
+CREATE TABLE load_versions (
+    load_version SERIAL PRIMARY KEY,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- 7. Change Log
+-- Keys of the rows each load inserted, updated or deleted
+CREATE TABLE change_log (
+    change_id BIGSERIAL PRIMARY KEY,
+    load_version INT NOT NULL,
+    table_name VARCHAR(50) NOT NULL,  -- e.g. 'pool_standings'
+    operation VARCHAR(10) NOT NULL,   -- 'insert', 'update', 'delete'
+    row_key JSONB NOT NULL,           -- Primary key columns, e.g. {"pool_id": ..., "team_name": ...}
+    FOREIGN KEY (load_version) REFERENCES load_versions(load_version)
+);
+
+CREATE INDEX change_log_load_version_idx ON change_log (load_version);
+
 -- Example Query after Import:
 -- SELECT * FROM match_results mr 
 -- JOIN teams t ON mr.team_name = t.team_name 
@@ -4,7 +4,8 @@ SET search_path TO ntvs;
 -- 1. Tournaments Table
 CREATE TABLE IF NOT EXISTS tournaments (
     tournament_id VARCHAR(50) PRIMARY KEY,
-    name VARCHAR(100) NOT NULL
+    name VARCHAR(100) NOT NULL,
+    season INT NOT NULL
 );
 
 -- 2. Teams Table
@@ -14,41 +15,72 @@ CREATE TABLE IF NOT EXISTS teams (
     division VARCHAR(50)
 );
 
+-- Pools, standings and matches are list-partitioned by season.
+-- load_data creates the partition for each season it loads
+-- (e.g. pools_2025) and can archive old seasons into ntvs_archive.
+
 -- 3. Pools Table
 CREATE TABLE IF NOT EXISTS pools (
-    pool_id VARCHAR(100) PRIMARY KEY,
+    pool_id VARCHAR(100),
+    season INT NOT NULL,
     tournament_id VARCHAR(50),
     division VARCHAR(50),
     pool_name VARCHAR(50),
     team_count INT,
+    PRIMARY KEY (pool_id, season),
     FOREIGN KEY (tournament_id) REFERENCES tournaments(tournament_id)
-);
+) PARTITION BY LIST (season);
 
 -- 4. Pool Standings Table (Link between Pools and Teams)
 CREATE TABLE IF NOT EXISTS pool_standings (
     pool_id VARCHAR(100),
     team_name VARCHAR(100),
+    season INT NOT NULL,
     rank_seed INT,
     matches_won INT,
     matches_lost INT,
     point_diff INT,
     pool_finish INT,
-    PRIMARY KEY (pool_id, team_name),
-    FOREIGN KEY (pool_id) REFERENCES pools(pool_id),
+    PRIMARY KEY (pool_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools(pool_id, season),
     FOREIGN KEY (team_name) REFERENCES teams(team_name)
-);
+) PARTITION BY LIST (season);
 
 -- 5. Match Results Table
 CREATE TABLE IF NOT EXISTS match_results (
     match_id VARCHAR(50),
     pool_id VARCHAR(100),
     team_name VARCHAR(100),
+    season INT NOT NULL,
     opponent_name VARCHAR(100),
     outcome VARCHAR(20),
     sets_won INT,
     sets_lost INT,
     score_log TEXT,
-    PRIMARY KEY (match_id, team_name),
-    FOREIGN KEY (pool_id) REFERENCES pools(pool_id),
+    PRIMARY KEY (match_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools(pool_id, season),
     FOREIGN KEY (team_name) REFERENCES teams(team_name)
+) PARTITION BY LIST (season);
+
+CREATE INDEX IF NOT EXISTS pools_tournament_idx ON pools (tournament_id, season);
+CREATE INDEX IF NOT EXISTS match_results_pool_idx ON match_results (pool_id, season);
+
+CREATE SCHEMA IF NOT EXISTS ntvs_archive;
+
+-- 6. Load Versions (one row per load_data run)
+CREATE TABLE IF NOT EXISTS load_versions (
+    load_version SERIAL PRIMARY KEY,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+
+-- 7. Change Log (keys inserted/updated/deleted by each load)
+CREATE TABLE IF NOT EXISTS change_log (
+    change_id BIGSERIAL PRIMARY KEY,
+    load_version INT NOT NULL,
+    table_name VARCHAR(50) NOT NULL,
+    operation VARCHAR(10) NOT NULL,
+    row_key JSONB NOT NULL,
+    FOREIGN KEY (load_version) REFERENCES load_versions(load_version)
+);
+
+CREATE INDEX IF NOT EXISTS change_log_load_version_idx ON change_log (load_version);
@@ -0,0 +1,147 @@
+-- Upgrades an existing (unpartitioned) ntvs database to the season-partitioned
+-- schema in init.sql without losing any loaded seasons.
+--
+--   psql -h localhost -U admin -d ntvs_db -v ON_ERROR_STOP=1 -f db/migrate_season_partitions.sql
+--
+-- Runs in one transaction: on any error nothing changes. The old tables are
+-- kept as pools_old, pool_standings_old and match_results_old; drop them once
+-- the migrated data has been checked.
+
+BEGIN;
+SET search_path TO ntvs;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+               WHERE n.nspname = 'ntvs' AND c.relname = 'pools' AND c.relkind = 'p') THEN
+        RAISE EXCEPTION 'ntvs.pools is already partitioned; nothing to migrate';
+    END IF;
+END $$;
+
+-- 1. Season on tournaments, from the {vstar_id}_{t_year} suffix.
+-- Fails (and rolls back) if any tournament_id has no year suffix.
+ALTER TABLE tournaments ADD COLUMN IF NOT EXISTS season INT;
+UPDATE tournaments SET season = substring(tournament_id FROM '_(\d{4})$')::INT WHERE season IS NULL;
+ALTER TABLE tournaments ALTER COLUMN season SET NOT NULL;
+
+-- 2. Partitioned tables alongside the old ones
+CREATE TABLE pools_new (
+    pool_id VARCHAR(100),
+    season INT NOT NULL,
+    tournament_id VARCHAR(50),
+    division VARCHAR(50),
+    pool_name VARCHAR(50),
+    team_count INT,
+    PRIMARY KEY (pool_id, season),
+    FOREIGN KEY (tournament_id) REFERENCES tournaments(tournament_id)
+) PARTITION BY LIST (season);
+
+CREATE TABLE pool_standings_new (
+    pool_id VARCHAR(100),
+    team_name VARCHAR(100),
+    season INT NOT NULL,
+    rank_seed INT,
+    matches_won INT,
+    matches_lost INT,
+    point_diff INT,
+    pool_finish INT,
+    PRIMARY KEY (pool_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools_new(pool_id, season),
+    FOREIGN KEY (team_name) REFERENCES teams(team_name)
+) PARTITION BY LIST (season);
+
+CREATE TABLE match_results_new (
+    match_id VARCHAR(50),
+    pool_id VARCHAR(100),
+    team_name VARCHAR(100),
+    season INT NOT NULL,
+    opponent_name VARCHAR(100),
+    outcome VARCHAR(20),
+    sets_won INT,
+    sets_lost INT,
+    score_log TEXT,
+    PRIMARY KEY (match_id, team_name, season),
+    FOREIGN KEY (pool_id, season) REFERENCES pools_new(pool_id, season),
+    FOREIGN KEY (team_name) REFERENCES teams(team_name)
+) PARTITION BY LIST (season);
+
+-- 3. One partition per existing season, named as load_data names them
+DO $$
+DECLARE
+    s INT;
+    t TEXT;
+BEGIN
+    FOR s IN SELECT DISTINCT season FROM ntvs.tournaments ORDER BY season LOOP
+        FOREACH t IN ARRAY ARRAY['pools', 'pool_standings', 'match_results'] LOOP
+            EXECUTE format('CREATE TABLE ntvs.%I PARTITION OF ntvs.%I FOR VALUES IN (%s)',
+                           t || '_' || s, t || '_new', s);
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- 4. Copy the data, taking each row's season from its tournament
+INSERT INTO pools_new (pool_id, season, tournament_id, division, pool_name, team_count)
+SELECT p.pool_id, t.season, p.tournament_id, p.division, p.pool_name, p.team_count
+FROM pools p
+JOIN tournaments t ON t.tournament_id = p.tournament_id;
+
+INSERT INTO pool_standings_new (pool_id, team_name, season, rank_seed, matches_won, matches_lost, point_diff, pool_finish)
+SELECT ps.pool_id, ps.team_name, t.season, ps.rank_seed, ps.matches_won, ps.matches_lost, ps.point_diff, ps.pool_finish
+FROM pool_standings ps
+JOIN pools p ON p.pool_id = ps.pool_id
+JOIN tournaments t ON t.tournament_id = p.tournament_id;
+
+INSERT INTO match_results_new (match_id, pool_id, team_name, season, opponent_name, outcome, sets_won, sets_lost, score_log)
+SELECT mr.match_id, mr.pool_id, mr.team_name, t.season, mr.opponent_name, mr.outcome, mr.sets_won, mr.sets_lost, mr.score_log
+FROM match_results mr
+JOIN pools p ON p.pool_id = mr.pool_id
+JOIN tournaments t ON t.tournament_id = p.tournament_id;
+
+-- Every old row must have been copied (rows whose pool has no tournament would be dropped)
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM ntvs.pools) <> (SELECT count(*) FROM ntvs.pools_new)
+       OR (SELECT count(*) FROM ntvs.pool_standings) <> (SELECT count(*) FROM ntvs.pool_standings_new)
+       OR (SELECT count(*) FROM ntvs.match_results) <> (SELECT count(*) FROM ntvs.match_results_new) THEN
+        RAISE EXCEPTION 'Row counts differ after copy; rows without a matching pool/tournament?';
+    END IF;
+END $$;
+
+-- 5. Swap names: old tables become *_old, partitioned ones take their place
+ALTER TABLE match_results RENAME TO match_results_old;
+ALTER TABLE pool_standings RENAME TO pool_standings_old;
+ALTER TABLE pools RENAME TO pools_old;
+ALTER INDEX match_results_pkey RENAME TO match_results_old_pkey;
+ALTER INDEX pool_standings_pkey RENAME TO pool_standings_old_pkey;
+ALTER INDEX pools_pkey RENAME TO pools_old_pkey;
+
+ALTER TABLE pools_new RENAME TO pools;
+ALTER TABLE pool_standings_new RENAME TO pool_standings;
+ALTER TABLE match_results_new RENAME TO match_results;
+ALTER INDEX pools_new_pkey RENAME TO pools_pkey;
+ALTER INDEX pool_standings_new_pkey RENAME TO pool_standings_pkey;
+ALTER INDEX match_results_new_pkey RENAME TO match_results_pkey;
+
+CREATE INDEX pools_tournament_idx ON pools (tournament_id, season);
+CREATE INDEX match_results_pool_idx ON match_results (pool_id, season);
+
+-- 6. Tables and schema added alongside partitioning
+CREATE SCHEMA IF NOT EXISTS ntvs_archive;
+
+CREATE TABLE IF NOT EXISTS load_versions (
+    load_version SERIAL PRIMARY KEY,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS change_log (
+    change_id BIGSERIAL PRIMARY KEY,
+    load_version INT NOT NULL,
+    table_name VARCHAR(50) NOT NULL,
+    operation VARCHAR(10) NOT NULL,
+    row_key JSONB NOT NULL,
+    FOREIGN KEY (load_version) REFERENCES load_versions(load_version)
+);
+
+CREATE INDEX IF NOT EXISTS change_log_load_version_idx ON change_log (load_version);
+
+COMMIT;
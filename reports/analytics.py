@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+
+# Compact, integer-indexed store for the NTVS tables, shared by the report scripts.
+#
+# Every string key (tournament, pool, team, club) is dictionary-encoded once into
+# an int32 code. Tables are held as column arrays of codes and small ints, and
+# the joins the reports need (pool -> tournament, team -> club, (pool, team) ->
+# standing) are prebuilt as lookup arrays. Rollups are then bincounts over
+# integer keys instead of merges and group-bys on repeated strings.
+#
+#   store = AnalyticsStore.from_csv()          # reads db_*.csv
+#   store.club_by_tournament()
+#   store.head_to_head(club='RYZE')
+
+OUTCOMES = ['Won', 'Lost', 'Split']
+UNKNOWN_CLUB = 'Unknown'
+
+
+def encode(values, index):
+    return index.get_indexer(pd.Series(values).astype(object)).astype(np.int32)
+
+
+def season_of(tournament_id):
+    # Tournament IDs carry the season as a suffix: {vstar_id}_{t_year}
+    suffix = str(tournament_id).rsplit('_', 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+class AnalyticsStore:
+
+    def __init__(self, tournaments, teams, pools, standings, matches):
+        # --- Dictionaries ---
+        self.tournament_ids = pd.Index(tournaments['tournament_id'].unique())
+        tournaments = tournaments.drop_duplicates('tournament_id').set_index('tournament_id').reindex(self.tournament_ids)
+        self.tournament_names = tournaments['name'].to_numpy(dtype=object)
+        if 'season' in tournaments:
+            self.tournament_season = tournaments['season'].fillna(0).to_numpy(dtype=np.int16)
+        else:
+            self.tournament_season = np.array([season_of(t) for t in self.tournament_ids], dtype=np.int16)
+
+        # Opponents can be placeholders ("Seed 3") that never made the teams table
+        self.team_names = pd.Index(pd.unique(pd.concat([
+            teams['team_name'], standings['team_name'],
+            matches['team_name'], matches['opponent_name'],
+        ]).dropna().astype(str)))
+        self.club_names = pd.Index(pd.unique(teams['club_name'].dropna().astype(str)).tolist() + [UNKNOWN_CLUB])
+        self.pool_ids = pd.Index(pools['pool_id'].unique())
+
+        # --- Join indexes ---
+        # team code -> club code (Unknown for teams missing from the teams table)
+        self.team_club = np.full(len(self.team_names), self.club_names.get_loc(UNKNOWN_CLUB), dtype=np.int32)
+        teams = teams.dropna(subset=['team_name', 'club_name'])
+        self.team_club[encode(teams['team_name'], self.team_names)] = encode(teams['club_name'], self.club_names)
+        self.team_has_club = np.zeros(len(self.team_names), dtype=bool)
+        self.team_has_club[encode(teams['team_name'], self.team_names)] = True
+
+        # pool code -> tournament code, plus pool attributes
+        pools = pools.drop_duplicates('pool_id').set_index('pool_id').reindex(self.pool_ids)
+        self.pool_tournament = encode(pools['tournament_id'], self.tournament_ids)
+        self.pool_division = pd.Categorical(pools['division'])
+        self.pool_name = pd.Categorical(pools['pool_name'])
+
+        # --- Standings (one row per team per pool) ---
+        self.st_pool = encode(standings['pool_id'], self.pool_ids)
+        self.st_team = encode(standings['team_name'], self.team_names)
+        self.st_rank_seed = standings['rank_seed'].fillna(0).to_numpy(dtype=np.int16)
+        self.st_won = standings['matches_won'].fillna(0).to_numpy(dtype=np.int32)
+        self.st_lost = standings['matches_lost'].fillna(0).to_numpy(dtype=np.int32)
+        self.st_point_diff = standings['point_diff'].fillna(0).to_numpy(dtype=np.int32)
+        self.st_pool_finish = standings['pool_finish'].to_numpy(dtype=np.float32)
+
+        # (pool, team) -> standings row, as a sorted key array for searchsorted
+        st_key = self.st_pool.astype(np.int64) * len(self.team_names) + self.st_team
+        self.st_order = np.argsort(st_key, kind='stable')
+        self.st_sorted_key = st_key[self.st_order]
+
+        # --- Matches (two rows per match, one per team's perspective) ---
+        self.mt_pool = encode(matches['pool_id'], self.pool_ids)
+        self.mt_team = encode(matches['team_name'], self.team_names)
+        self.mt_opponent = encode(matches['opponent_name'], self.team_names)
+        self.mt_outcome = encode(matches['outcome'], pd.Index(OUTCOMES)).astype(np.int8)
+        self.mt_sets_won = matches['sets_won'].fillna(0).to_numpy(dtype=np.int16)
+        self.mt_sets_lost = matches['sets_lost'].fillna(0).to_numpy(dtype=np.int16)
+        self.mt_score_log = pd.Categorical(matches['score_log'])
+
+    @classmethod
+    def from_csv(cls, prefix='db_'):
+        return cls(
+            pd.read_csv(f'{prefix}tournaments.csv'),
+            pd.read_csv(f'{prefix}teams.csv'),
+            pd.read_csv(f'{prefix}pools.csv'),
+            pd.read_csv(f'{prefix}pool_standings.csv'),
+            pd.read_csv(f'{prefix}match_results.csv'),
+        )
+
+    def memory_usage(self):
+        """Bytes held by the store's arrays and dictionaries."""
+        total = 0
+        for value in vars(self).values():
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+                if value.dtype == object:
+                    total += sum(len(str(v)) for v in value)
+            elif isinstance(value, pd.Index):
+                total += value.memory_usage(deep=True)
+            elif isinstance(value, pd.Categorical):
+                total += value.codes.nbytes + value.categories.memory_usage(deep=True)
+        return total
+
+    def club_code(self, club_name):
+        return self.club_names.get_loc(club_name) if club_name in self.club_names else None
+
+    # --- Rollups ---
+
+    def _standings_mask(self, club=None):
+        # Standings whose pool and team resolve, matching the inner joins the
+        # report scripts did against pools and teams
+        mask = (self.st_pool >= 0) & (self.st_team >= 0)
+        mask[mask] = self.team_has_club[self.st_team[mask]] & (self.pool_tournament[self.st_pool[mask]] >= 0)
+        if club is not None:
+            mask[mask] = self.team_club[self.st_team[mask]] == self.club_code(club)
+        return mask
+
+    def _matches_mask(self, club=None):
+        mask = (self.mt_pool >= 0) & (self.mt_team >= 0) & (self.mt_outcome >= 0)
+        mask[mask] = self.team_has_club[self.mt_team[mask]] & (self.pool_tournament[self.mt_pool[mask]] >= 0)
+        if club is not None:
+            mask[mask] = self.team_club[self.mt_team[mask]] == self.club_code(club)
+        return mask
+
+    def _sum_by(self, keys, n_keys, valid):
+        """Sums standings won/lost per integer key and counts distinct teams."""
+        won = np.bincount(keys, weights=self.st_won[valid], minlength=n_keys).astype(np.int64)
+        lost = np.bincount(keys, weights=self.st_lost[valid], minlength=n_keys).astype(np.int64)
+        n_teams = len(self.team_names)
+        pairs = np.unique(keys * n_teams + self.st_team[valid])
+        team_count = np.bincount(pairs // n_teams, minlength=n_keys)
+        return won, lost, team_count
+
+    def club_by_tournament(self):
+        """Club totals per tournament. Keyed by tournament_id: names repeat every season."""
+        valid = self._standings_mask()
+        n_clubs = len(self.club_names)
+        tournaments = self.pool_tournament[self.st_pool[valid]].astype(np.int64)
+        keys = tournaments * n_clubs + self.team_club[self.st_team[valid]]
+
+        won, lost, team_count = self._sum_by(keys, len(self.tournament_ids) * n_clubs, valid)
+        present = np.flatnonzero(team_count)
+
+        tournament_codes = present // n_clubs
+        result = pd.DataFrame({
+            'tournament_id': self.tournament_ids[tournament_codes],
+            'season': self.tournament_season[tournament_codes],
+            'tournament_name': self.tournament_names[tournament_codes],
+            'club_name': self.club_names[present % n_clubs],
+            'matches_won': won[present],
+            'matches_lost': lost[present],
+            'teams_participating': team_count[present],
+        })
+        result['total_matches'] = result['matches_won'] + result['matches_lost']
+        result['win_rate'] = result['matches_won'] / result['total_matches'].where(result['total_matches'] > 0)
+        return result
+
+    def team_by_season(self):
+        valid = self._standings_mask()
+        n_teams = len(self.team_names)
+        seasons, season_codes = np.unique(
+            self.tournament_season[self.pool_tournament[self.st_pool[valid]]], return_inverse=True)
+        teams = self.st_team[valid]
+        keys = season_codes.astype(np.int64) * n_teams + teams
+
+        n_keys = len(seasons) * n_teams
+        won = np.bincount(keys, weights=self.st_won[valid], minlength=n_keys).astype(np.int64)
+        lost = np.bincount(keys, weights=self.st_lost[valid], minlength=n_keys).astype(np.int64)
+        pools = np.bincount(keys, minlength=n_keys)
+        present = np.flatnonzero(pools)
+
+        result = pd.DataFrame({
+            'season': seasons[present // n_teams],
+            'team_name': self.team_names[present % n_teams],
+            'club_name': self.club_names[self.team_club[present % n_teams]],
+            'pools_played': pools[present],
+            'matches_won': won[present],
+            'matches_lost': lost[present],
+        })
+        total = result['matches_won'] + result['matches_lost']
+        result['win_rate'] = (result['matches_won'] / total.where(total > 0)).fillna(0)
+        return result
+
+    def club_summary(self):
+        valid = self._standings_mask()
+        n_clubs = len(self.club_names)
+        clubs = self.team_club[self.st_team[valid]].astype(np.int64)
+
+        won, lost, team_count = self._sum_by(clubs, n_clubs, valid)
+        finish = self.st_pool_finish[valid]
+        has_finish = ~np.isnan(finish)
+        finish_sum = np.bincount(clubs[has_finish], weights=finish[has_finish], minlength=n_clubs)
+        finish_count = np.bincount(clubs[has_finish], minlength=n_clubs)
+        present = np.flatnonzero(team_count)
+
+        summary = pd.DataFrame({
+            'teams': team_count[present],
+            'won': won[present],
+            'lost': lost[present],
+            'avg_pool_finish': finish_sum[present] / np.where(finish_count[present] > 0, finish_count[present], np.nan),
+        }, index=pd.Index(self.club_names[present], name='club_name'))
+        total = summary['won'] + summary['lost']
+        summary['win_rate'] = (summary['won'] / total.where(total > 0)).fillna(0)
+        return summary.sort_values(by=['win_rate', 'won'], ascending=False)
+
+    def head_to_head(self, club=None):
+        """Won/Lost/Split counts indexed by (club_name, opp_club)."""
+        valid = self._matches_mask(club)
+        n_clubs = len(self.club_names)
+        opponents = self.mt_opponent[valid]
+        opp_clubs = np.where(opponents >= 0, self.team_club[opponents], self.club_names.get_loc(UNKNOWN_CLUB))
+        keys = (self.team_club[self.mt_team[valid]].astype(np.int64) * n_clubs + opp_clubs) * len(OUTCOMES)
+        keys += self.mt_outcome[valid]
+
+        counts = np.bincount(keys, minlength=n_clubs * n_clubs * len(OUTCOMES)).reshape(-1, len(OUTCOMES))
+        present = np.flatnonzero(counts.sum(axis=1))
+
+        hth = pd.DataFrame(
+            counts[present], columns=OUTCOMES,
+            index=pd.MultiIndex.from_arrays(
+                [self.club_names[present // n_clubs], self.club_names[present % n_clubs]],
+                names=['club_name', 'opp_club']),
+        )
+        hth['Total'] = hth['Won'] + hth['Lost'] + hth['Split']
+        hth['Win %'] = (hth['Won'] / hth['Total']).mul(100).round(1)
+        return hth
+
+    # --- Decoded views ---
+
+    def team_rows(self, club=None):
+        """Standings with tournament, pool and club context, one row per team per pool."""
+        valid = self._standings_mask(club)
+        pools = self.st_pool[valid]
+        teams = self.st_team[valid]
+        tournaments = self.pool_tournament[pools]
+
+        return pd.DataFrame({
+            'pool_id': pd.Categorical.from_codes(pools, self.pool_ids),
+            'team_name': pd.Categorical.from_codes(teams, self.team_names),
+            'season': self.tournament_season[tournaments],
+            'rank_seed': self.st_rank_seed[valid],
+            'matches_won': self.st_won[valid],
+            'matches_lost': self.st_lost[valid],
+            'point_diff': self.st_point_diff[valid],
+            'pool_finish': self.st_pool_finish[valid],
+            'tournament_id': pd.Categorical.from_codes(tournaments, self.tournament_ids),
+            'division': self.pool_division[pools],
+            'pool_name': self.pool_name[pools],
+            'tournament_name': self.tournament_names[tournaments],
+            'club_name': pd.Categorical.from_codes(self.team_club[teams], self.club_names),
+        })
+
+    def club_matches(self, club):
+        """A club's matches with tournament, pool and pool standing context."""
+        valid = self._matches_mask(club)
+        pools = self.mt_pool[valid]
+        teams = self.mt_team[valid]
+        opponents = self.mt_opponent[valid]
+        tournaments = self.pool_tournament[pools]
+
+        # Look up each (pool, team) in the prebuilt standings index instead of merging
+        keys = pools.astype(np.int64) * len(self.team_names) + teams
+        pos = np.searchsorted(self.st_sorted_key, keys)
+        found = pos < len(self.st_sorted_key)
+        found[found] = self.st_sorted_key[pos[found]] == keys[found]
+        rank_seed = pd.array([pd.NA] * len(keys), dtype='Int16')
+        rank_seed[found] = self.st_rank_seed[self.st_order[pos[found]]]
+
+        return pd.DataFrame({
+            'name': self.tournament_names[tournaments],
+            'division_pool': self.pool_division[pools],
+            'pool_name': self.pool_name[pools],
+            'team_name': self.team_names[teams],
+            'rank_seed': rank_seed,
+            'opponent_name': np.where(opponents >= 0, self.team_names.to_numpy()[opponents], None),
+            'outcome': pd.Categorical.from_codes(self.mt_outcome[valid], OUTCOMES),
+            'score_log': self.mt_score_log[valid],
+        })
@@ -0,0 +1,136 @@
+import os
+import re
+import sys
+import html
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from analytics import AnalyticsStore
+
+# Batch version of generate_club_report.py: loads the tables once and writes a
+# report for every club into OUTPUT_DIR/<club>/, plus an index.
+#
+#   python generate_all_club_reports.py                # all clubs
+#   python generate_all_club_reports.py --incremental  # only clubs whose data changed
+
+OUTPUT_DIR = 'club_reports'
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, 'manifest.json')
+
+
+def club_slug(club_name):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', str(club_name)).strip('_') or 'unknown'
+
+
+def fingerprint(*frames):
+    """Stable hash of a club's input rows, used to skip unchanged clubs."""
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def render_club(job):
+    # Runs in a worker process; only the club's own (small) frames are shipped
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    club_name, club_dir, summary, club_teams, club_hth = job
+    os.makedirs(club_dir, exist_ok=True)
+
+    summary.to_csv(os.path.join(club_dir, 'summary.csv'), index=False)
+    club_teams.to_csv(os.path.join(club_dir, 'teams.csv'), index=False)
+    club_hth.to_csv(os.path.join(club_dir, 'head_to_head.csv'))
+
+    team_wr = club_teams.groupby('team_name', observed=True)[['matches_won', 'matches_lost']].sum()
+    team_wr['win_rate'] = team_wr['matches_won'] / (team_wr['matches_won'] + team_wr['matches_lost'])
+    team_wr = team_wr['win_rate'].fillna(0).sort_values(ascending=False)
+
+    fig, ax = plt.subplots(figsize=(max(6, len(team_wr) * 0.6), 5))
+    ax.bar(team_wr.index, team_wr.values, color='orange')
+    ax.set_title(f'{club_name} Win Rate by Team (Pool Play)')
+    ax.set_ylim(0, 1)
+    ax.set_ylabel('Win Rate')
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    fig.savefig(os.path.join(club_dir, 'team_win_rates.png'))
+    plt.close(fig)
+
+    return club_name
+
+
+def write_index(club_summary):
+    index = club_summary.reset_index()
+    index['report'] = index['club_name'].map(lambda c: f"{club_slug(c)}/")
+    index.to_csv(os.path.join(OUTPUT_DIR, 'index.csv'), index=False, float_format='%.3f')
+
+    rows = "\n".join(
+        f"<tr><td><a href='{html.escape(r.report)}summary.csv'>{html.escape(str(r.club_name))}</a></td>"
+        f"<td>{r.teams}</td><td>{r.won}-{r.lost}</td><td>{r.win_rate:.1%}</td></tr>"
+        for r in index.itertuples()
+    )
+    with open(os.path.join(OUTPUT_DIR, 'index.html'), 'w') as f:
+        f.write(
+            "<html><body><h1>Club Reports</h1><table>"
+            "<tr><th>Club</th><th>Teams</th><th>Record</th><th>Win Rate</th></tr>\n"
+            f"{rows}\n</table></body></html>\n"
+        )
+
+
+def main(incremental=False):
+    store = AnalyticsStore.from_csv()
+    team_rows = store.team_rows()
+    club_summary = store.club_summary()
+    hth = store.head_to_head()
+
+    previous = {}
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE) as f:
+            previous = json.load(f)
+
+    # Split every frame by club once instead of filtering per club
+    teams_by_club = dict(tuple(
+        team_rows.sort_values(['tournament_name', 'team_name']).groupby('club_name', observed=True)))
+    hth_by_club = {
+        club: frame.droplevel('club_name').sort_values(by='Total', ascending=False)
+        for club, frame in hth.groupby(level='club_name')
+    }
+
+    manifest = {}
+    jobs = []
+    for club_name, club_teams in teams_by_club.items():
+        club_hth = hth_by_club.get(club_name, hth.iloc[0:0].droplevel('club_name'))
+        summary = club_summary.loc[[club_name]].reset_index()
+
+        club_dir = os.path.join(OUTPUT_DIR, club_slug(club_name))
+        manifest[club_name] = fingerprint(club_teams, club_hth.reset_index())
+        if incremental and previous.get(club_name) == manifest[club_name] and os.path.isdir(club_dir):
+            continue
+        jobs.append((club_name, club_dir, summary, club_teams, club_hth))
+
+    # Drop reports of clubs that are gone from the data, unless another club
+    # still maps to the same directory
+    current_slugs = {club_slug(club_name) for club_name in manifest}
+    for club_name in previous:
+        slug = club_slug(club_name)
+        if club_name not in manifest and slug not in current_slugs:
+            shutil.rmtree(os.path.join(OUTPUT_DIR, slug), ignore_errors=True)
+            print(f"  Removed report for {club_name}")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"Rendering {len(jobs)} of {len(manifest)} club reports...")
+    with ProcessPoolExecutor() as pool:
+        for club_name in pool.map(render_club, jobs, chunksize=4):
+            print(f"  Generated report for {club_name}")
+
+    write_index(club_summary)
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"Saved index to '{os.path.join(OUTPUT_DIR, 'index.html')}'")
+
+
+if __name__ == '__main__':
+    main(incremental='--incremental' in sys.argv[1:])
@@ -1,42 +1,20 @@
-
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
+from analytics import AnalyticsStore
 
 # Load data
-df = pd.read_csv('kickoff_classic_teams.csv')
-
-def extract_club_name(team_name):
-    # Heuristic: First word is usually club name, e.g. "RYZE"
-    # Handling exceptions: 
-    # "Madfrog" is one word in some, "Mad Frog" in others? (Looks one word in data: "Madfrog 13N")
-    # "FH" -> FH
-    # "TEJAS" -> TEJAS
-    # "1United" -> 1United
-    if not isinstance(team_name, str): return "Unknown"
-    
-    parts = team_name.split()
-    if not parts: return "Unknown"
-    
-    # Check for known multi-word clubs if any?
-    # For now, simplistic first word.
-    return parts[0]
-
-df['Club'] = df['Team'].apply(extract_club_name)
+store = AnalyticsStore.from_csv()
 
 # --- 1. General Club Performance ---
 
 # Aggregate stats by Club
-club_stats = df.groupby('Club').agg({
-    'Won': 'sum',
-    'Lost': 'sum',
-    'Team': 'count'
-}).rename(columns={'Team': 'Team Count'})
-
-club_stats['Total Games'] = club_stats['Won'] + club_stats['Lost']
-club_stats['Win Rate'] = club_stats['Won'] / club_stats['Total Games']
-club_stats['Win Rate'] = club_stats['Win Rate'].fillna(0)
+club_stats = store.club_summary().rename(columns={
+    'teams': 'Team Count',
+    'won': 'Won',
+    'lost': 'Lost',
+    'win_rate': 'Win Rate',
+})
+club_stats.index.name = 'Club'
 
 # Sort by Win Rate (for clubs with > 1 team or > 5 games to avoid noise)
 # Let's just sort by Win Rate descending
@@ -63,7 +41,15 @@ print(f"Generated 'club_performance.png'")
 # --- 2. RYZE Specific Report ---
 
 target_club = "RYZE"
-ryze_teams = df[df['Club'] == target_club].copy()
+ryze_teams = store.team_rows(club=target_club).rename(columns={
+    'division': 'Division',
+    'team_name': 'Team',
+    'pool_name': 'Pool',
+    'rank_seed': 'Rank',
+    'matches_won': 'Won',
+    'matches_lost': 'Lost',
+    'pool_finish': 'Pool Finish',
+})
 
 if not ryze_teams.empty:
     print(f"\n--- {target_club} Teams Report ---")
@@ -81,7 +67,7 @@ if not ryze_teams.empty:
 
     # Visualization 2: RYZE Performance vs Average
     # Compare RYZE win rate to global average
-    global_avg_wr = df['Won'].sum() / (df['Won'].sum() + df['Lost'].sum())
+    global_avg_wr = club_stats['Won'].sum() / (club_stats['Won'].sum() + club_stats['Lost'].sum())
     ryze_wr = total_won / (total_won + total_lost)
     
     plt.figure(figsize=(6, 6))
@@ -96,38 +82,13 @@ else:
     print(f"No teams found for club: {target_club}")
 
 # --- 3. Head to Head Analysis for RYZE ---
-# Parse 'Pool Match Results' column
-# Format: "Won vs Opponent (Scores) | Lost vs Opponent (Scores)"
-
-head_to_head = {} # Opponent -> {'Won': 0, 'Lost': 0, 'Split': 0}
+# Match results are grouped by opponent club inside the store
 
 if not ryze_teams.empty:
-    for _, row in ryze_teams.iterrows():
-        matches_str = row['Pool Match Results']
-        if pd.isna(matches_str): continue
-        
-        matches = matches_str.split(' | ')
-        for m in matches:
-            # Parse outcome and opponent
-            # e.g. "Won vs TEAM_NAME (scores)"
-            match_data = re.match(r'(Won|Lost|Split) vs (.+) \(', m)
-            if match_data:
-                outcome = match_data.group(1)
-                opponent_name = match_data.group(2)
-                
-                # Extract opponent club
-                opp_club = extract_club_name(opponent_name)
-                
-                if opp_club not in head_to_head:
-                    head_to_head[opp_club] = {'Won': 0, 'Lost': 0, 'Split': 0}
-                
-                head_to_head[opp_club][outcome] += 1
+    hth_df = store.head_to_head(club=target_club).droplevel('club_name')
 
-    if head_to_head:
+    if not hth_df.empty:
         print(f"\n--- {target_club} Head-to-Head Performance (CSV) ---")
-        hth_df = pd.DataFrame.from_dict(head_to_head, orient='index').fillna(0)
-        hth_df['Total'] = hth_df['Won'] + hth_df['Lost'] + hth_df['Split']
-        hth_df['Win %'] = (hth_df['Won'] / hth_df['Total']).mul(100).round(1)
         
         # Sort by most games played against
         hth_df = hth_df.sort_values(by='Total', ascending=False)